@@ -15,6 +15,14 @@
 
 MPU6050 mpu(Wire);
 
+// 0: text lines "roll,pitch,yaw\n" (default)
+// 1: 8-byte binary frames for `python_visualizer.py --binary`:
+//    0xA5, roll/pitch/yaw as little-endian int16 deci-degrees, XOR of those 6 bytes
+//    Representable range: -3276.8 .. 3276.7 degrees in 0.1 degree steps. getAngleZ() yaw is
+//    integrated and never wrapped, so this has to cover at least the visualizer's +-360 clamp,
+//    which is what the text format already reaches.
+#define BINARY_FRAMES 0
+
 // Use the default I2C pins (SDA=21, SCL=22)
 // Make sure AD0 is connected to GND for address 0x68
 
@@ -44,6 +52,20 @@ void loop() {
   float roll = mpu.getAngleY();
   float yaw = mpu.getAngleZ();
 
+#if BINARY_FRAMES
+  int16_t v[3] = {
+    (int16_t)constrain(roll * 10.0f, -32768.0f, 32767.0f),
+    (int16_t)constrain(pitch * 10.0f, -32768.0f, 32767.0f),
+    (int16_t)constrain(yaw * 10.0f, -32768.0f, 32767.0f)
+  };
+  uint8_t frame[8];
+  frame[0] = 0xA5;
+  memcpy(frame + 1, v, 6);  // the ESP32 is little-endian
+  uint8_t chk = 0;
+  for (int i = 1; i < 7; i++) chk ^= frame[i];
+  frame[7] = chk;
+  Serial.write(frame, sizeof(frame));
+#else
   /*
    * Print the data as a simple comma-separated string.
    * Example: "12.34,-45.67,0.12\n"
@@ -54,6 +76,7 @@ void loop() {
   Serial.print(pitch); // Then Pitch (X-axis)
   Serial.print(",");
   Serial.println(yaw); // Then Yaw (Z-axis)
+#endif
 
   // Send data 50 times per second (a 20ms delay)
   delay(20); 
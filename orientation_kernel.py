@@ -0,0 +1,100 @@
+"""
+Fused per-frame kernels for the visualizers.
+
+update_orientation (PyQt): one call turns the smoothed roll/pitch/yaw into the
+next slerped quaternion and writes the plane vertices rotated by it.
+smooth_step (Ursina): clamps the latest sample, applies the EMA and produces the
+meter widths in one pass.
+
+The functions are compiled with numba when it is installed and run as plain
+Python otherwise.
+"""
+
+import math
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional
+    def njit(*args, **kwargs):
+        def wrap(fn):
+            return fn
+        return wrap
+
+
+@njit(cache=True, fastmath=True)
+def update_orientation(prev_q, roll, pitch, yaw, t, verts, out, q_out):
+    """
+    prev_q: current quaternion (w, x, y, z); roll/pitch/yaw in degrees
+    t: slerp factor towards the target orientation
+    Writes the new quaternion into q_out and verts rotated by it into out.
+    Returns q_out.
+    """
+    # target quaternion from euler angles, ZYX order
+    cr = math.cos(math.radians(roll)*0.5)
+    sr = math.sin(math.radians(roll)*0.5)
+    cp = math.cos(math.radians(pitch)*0.5)
+    sp = math.sin(math.radians(pitch)*0.5)
+    cy = math.cos(math.radians(yaw)*0.5)
+    sy = math.sin(math.radians(yaw)*0.5)
+    tw = cy*cp*cr + sy*sp*sr
+    tx = cy*cp*sr - sy*sp*cr
+    ty = cy*sp*cr + sy*cp*sr
+    tz = sy*cp*cr - cy*sp*sr
+
+    # slerp from prev_q, taking the short way round
+    dot = prev_q[0]*tw + prev_q[1]*tx + prev_q[2]*ty + prev_q[3]*tz
+    sign = 1.0
+    if dot < 0.0:
+        sign = -1.0
+        dot = -dot
+    if 1.0 - dot < 1e-6:
+        # already at the target
+        s0 = 0.0
+        s1 = sign
+    elif dot > 0.9995:
+        # linear fallback (no trig for small per-frame steps)
+        s0 = 1.0 - t
+        s1 = sign*t
+    else:
+        theta_0 = math.acos(dot)
+        sin_0 = math.sin(theta_0)
+        s0 = math.sin((1.0 - t)*theta_0) / sin_0
+        s1 = sign*math.sin(t*theta_0) / sin_0
+    w = s0*prev_q[0] + s1*tw
+    x = s0*prev_q[1] + s1*tx
+    y = s0*prev_q[2] + s1*ty
+    z = s0*prev_q[3] + s1*tz
+    inv = 1.0 / math.sqrt(w*w + x*x + y*y + z*z)
+    w *= inv; x *= inv; y *= inv; z *= inv
+    q_out[0] = w; q_out[1] = x; q_out[2] = y; q_out[3] = z
+
+    # rotation matrix and vertex transform
+    xx = x*x; yy = y*y; zz = z*z
+    xy = x*y; xz = x*z; yz = y*z
+    wx = w*x; wy = w*y; wz = w*z
+    r00 = 1-2*(yy+zz); r01 = 2*(xy - wz);  r02 = 2*(xz + wy)
+    r10 = 2*(xy + wz);  r11 = 1-2*(xx+zz); r12 = 2*(yz - wx)
+    r20 = 2*(xz - wy);  r21 = 2*(yz + wx);  r22 = 1-2*(xx+yy)
+    for i in range(verts.shape[0]):
+        vx = verts[i, 0]; vy = verts[i, 1]; vz = verts[i, 2]
+        out[i, 0] = r00*vx + r01*vy + r02*vz
+        out[i, 1] = r10*vx + r11*vy + r12*vz
+        out[i, 2] = r20*vx + r21*vy + r22*vz
+    return q_out
+
+
+@njit(cache=True, fastmath=True)
+def smooth_step(latest, smoothed, alpha, out_norm):
+    """
+    latest: newest roll/pitch/yaw in degrees, clamped to +-360 before use
+    smoothed: EMA state, updated in place (s += alpha*(latest - s))
+    Writes each smoothed angle mapped from -180..180 to a 0..0.25 meter width into out_norm.
+    """
+    for i in range(3):
+        v = latest[i]
+        if v > 360.0:
+            v = 360.0
+        elif v < -360.0:
+            v = -360.0
+        smoothed[i] += alpha*(v - smoothed[i])
+        out_norm[i] = (smoothed[i] + 180.0)*(0.25/360.0)
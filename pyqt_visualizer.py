@@ -14,9 +14,7 @@ Usage:
 import sys
 import argparse
 import math
-import threading
 import time
-from collections import deque
 
 import os
 import numpy as np
@@ -29,36 +27,84 @@ import pyqtgraph as pg
 import pyqtgraph.opengl as gl
 import serial
 
+from orientation_kernel import update_orientation
+from serial_parse import newest_sample
+
 
 class SerialThread(QtCore.QThread):
-    line_received = QtCore.pyqtSignal(str)
+    BUF_SIZE = 65536
+    # after each batch, let bytes pile up in the OS buffer for this long before reading again,
+    # so a fast sender wakes the thread ~120 times a second instead of once per line
+    FORWARD_DELAY_MS = 8
+    _priority_warned = False
 
     def __init__(self, port, baud=115200, parent=None):
         super().__init__(parent)
         self.port = port
         self.baud = baud
         self._running = True
+        # single-slot hand-off: the reader overwrites, the GUI takes the newest sample.
+        # Plain attribute loads/stores are atomic under the GIL, so neither side locks.
+        self._latest_slot = None
+        self._taken = None
+        # fixed receive buffer; complete lines are consumed in place and the
+        # trailing partial line is moved back to the front, so it never grows
+        self._buf = bytearray(self.BUF_SIZE)
+        self._head = 0
+
+    def take_latest(self):
+        """Return the newest (roll, pitch, yaw) sample, or None if nothing arrived since the last call."""
+        sample = self._latest_slot
+        if sample is self._taken:
+            return None
+        self._taken = sample
+        return sample
+
+    def _raise_priority(self):
+        # Qt maps TimeCriticalPriority to THREAD_PRIORITY_TIME_CRITICAL on Windows, but under
+        # Linux's default SCHED_OTHER policy it has no effect, so ask for SCHED_FIFO directly
+        if sys.platform.startswith('linux'):
+            try:
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(20))
+            except (OSError, AttributeError) as e:
+                # unprivileged users always get EPERM here; say so once, not on every connect
+                if not SerialThread._priority_warned:
+                    SerialThread._priority_warned = True
+                    print('Serial thread stays at normal priority:', e)
 
     def run(self):
+        self._raise_priority()
         try:
-            ser = serial.Serial(self.port, self.baud, timeout=0.1)
+            # the read timeout only bounds how long stop() waits for the loop to notice
+            ser = serial.Serial(self.port, self.baud, timeout=0.05)
         except Exception as e:
             print('Serial open failed:', e)
             return
-        buf = b''
+        buf = self._buf
+        view = memoryview(buf)
         while self._running:
             try:
-                data = ser.read(256)
-                if data:
-                    buf += data
-                    while b'\n' in buf:
-                        line, buf = buf.split(b'\n', 1)
-                        try:
-                            self.line_received.emit(line.decode('utf-8').strip())
-                        except Exception:
-                            pass
-                else:
-                    time.sleep(0.01)
+                if self._head == len(buf):
+                    # a full buffer without a newline is noise; start over
+                    self._head = 0
+                # block until at least one byte arrives, then drain whatever the OS has buffered
+                head = self._head
+                n = ser.readinto(view[head:head + max(1, min(ser.in_waiting, len(buf) - head))])
+                if n:
+                    end = head + n
+                    idx = buf.rfind(b'\n', head, end)
+                    if idx < 0:
+                        self._head = end
+                        continue
+                    # only the newest complete line matters, parsed in place
+                    sample = newest_sample(buf, idx)
+                    if sample is not None:
+                        self._latest_slot = sample
+                    # shift the trailing partial line to the front (memmove, no reallocation)
+                    rest = end - idx - 1
+                    view[:rest] = view[idx+1:end]
+                    self._head = rest
+                    self.msleep(self.FORWARD_DELAY_MS)
             except Exception as e:
                 print('Serial read error:', e)
                 break
@@ -72,7 +118,78 @@ class SerialThread(QtCore.QThread):
         self.wait()
 
 
+class _PortScanSignals(QtCore.QObject):
+    done = QtCore.pyqtSignal(list)
+
+
+class _PortScan(QtCore.QRunnable):
+    """Enumerate serial ports off the GUI thread (comports() can block for seconds on Windows)."""
+
+    def __init__(self, signals):
+        super().__init__()
+        self.signals = signals
+
+    def run(self):
+        try:
+            from serial.tools import list_ports
+            ports = [p.device for p in list_ports.comports()]
+        except Exception:
+            ports = []
+        self.signals.done.emit(ports)
+
+
+class ReadoutWidget(QtWidgets.QWidget):
+    """Roll/pitch/yaw values and their meters, painted in one pass."""
+    NAMES = ('Roll', 'Pitch', 'Yaw')
+    ROW_HEIGHT = 40
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.values = [0.0, 0.0, 0.0]
+        self._texts = ['%s: %.2f' % (name, 0.0) for name in self.NAMES]
+        self.setFixedHeight(3 * self.ROW_HEIGHT)
+
+    def set_values(self, roll, pitch, yaw):
+        # only reformat and repaint axes whose displayed (2-decimal) value changed
+        first = last = None
+        for i, v in enumerate((roll, pitch, yaw)):
+            v = round(float(v), 2)
+            if v != self.values[i]:
+                self.values[i] = v
+                self._texts[i] = '%s: %.2f' % (self.NAMES[i], v)
+                if first is None:
+                    first = i
+                last = i
+        if first is not None:
+            # one repaint request covering just the changed rows
+            self.update(0, first * self.ROW_HEIGHT, self.width(), (last - first + 1) * self.ROW_HEIGHT)
+
+    def paintEvent(self, ev):
+        p = QtGui.QPainter(self)
+        pal = self.palette()
+        fm = p.fontMetrics()
+        w = self.width()
+        dirty = ev.rect()
+        for i, (text, v) in enumerate(zip(self._texts, self.values)):
+            top = i * self.ROW_HEIGHT
+            if top >= dirty.bottom() + 1 or top + self.ROW_HEIGHT <= dirty.top():
+                continue
+            p.drawText(0, top + fm.ascent(), text)
+            # meter spans -180..180 like the old progress bars
+            bar = QtCore.QRect(0, top + fm.height() + 2, w - 1, self.ROW_HEIGHT - fm.height() - 8)
+            p.fillRect(bar, pal.base())
+            frac = (max(-180.0, min(180.0, v)) + 180.0) / 360.0
+            p.fillRect(QtCore.QRect(bar.left(), bar.top(), int(bar.width() * frac), bar.height()), pal.highlight())
+            p.setPen(pal.mid().color())
+            p.drawRect(bar)
+            p.setPen(pal.windowText().color())
+        p.end()
+
+
 class PyQtVisualizer(QtWidgets.QWidget):
+    DRAW_THRESHOLD = 0.1  # degrees of change before the 3D view is redrawn
+    PORT_CACHE_SECS = 1.0  # repeat refreshes within this window reuse the last scan
+
     def __init__(self, port=None, mock=False):
         super().__init__()
         self.setWindowTitle('MPU6050 PyQt Visualizer')
@@ -91,21 +208,9 @@ class PyQtVisualizer(QtWidgets.QWidget):
         right = QtWidgets.QVBoxLayout()
         h.addLayout(right, 1)
 
-        # Readouts
-        self.roll_label = QtWidgets.QLabel('Roll: 0.00')
-        self.pitch_label = QtWidgets.QLabel('Pitch: 0.00')
-        self.yaw_label = QtWidgets.QLabel('Yaw: 0.00')
-        right.addWidget(self.roll_label)
-        right.addWidget(self.pitch_label)
-        right.addWidget(self.yaw_label)
-
-        # Meters (progress bars)
-        self.roll_meter = QtWidgets.QProgressBar(); self.roll_meter.setRange(-180, 180)
-        self.pitch_meter = QtWidgets.QProgressBar(); self.pitch_meter.setRange(-180, 180)
-        self.yaw_meter = QtWidgets.QProgressBar(); self.yaw_meter.setRange(-180, 180)
-        right.addWidget(self.roll_meter)
-        right.addWidget(self.pitch_meter)
-        right.addWidget(self.yaw_meter)
+        # Readouts and meters (one custom-painted widget)
+        self.readout = ReadoutWidget()
+        right.addWidget(self.readout)
 
         # Buttons
         self.mock_btn = QtWidgets.QPushButton('Toggle Mock')
@@ -125,9 +230,14 @@ class PyQtVisualizer(QtWidgets.QWidget):
         right.addWidget(self.mock_btn)
         right.addWidget(self.calib_btn)
 
-        # GL items: plane mesh
-        verts, faces = self._make_plane_mesh()
-        meshdata = gl.MeshData(vertexes=verts, faces=faces)
+        # GL items: plane mesh (uploaded once, orientation is applied as a GL transform)
+        self._verts, self._faces = self._make_plane_mesh()
+        # the base geometry is shared by the plane, the kernel and the trail; keep it immutable
+        self._verts.setflags(write=False)
+        self._faces.setflags(write=False)
+        meshdata = gl.MeshData(vertexes=self._verts, faces=self._faces)
+        # rotated copy of the plane vertices, written by the orientation kernel for the trail
+        self._verts_out = np.empty_like(self._verts)
         self.plane = gl.GLMeshItem(meshdata=meshdata, smooth=True, shader='shaded', color=(0.2,0.6,1,1))
         self.view.addItem(self.plane)
 
@@ -135,16 +245,38 @@ class PyQtVisualizer(QtWidgets.QWidget):
         gx = gl.GLGridItem(); gx.rotate(90, 0,1,0); gx.setSize(6,6); self.view.addItem(gx)
         gy = gl.GLGridItem(); gy.rotate(90, 1,0,0); gy.setSize(6,6); self.view.addItem(gy)
 
-        # history trail as small translucent planes
-        self.trail = deque(maxlen=40)
+        # history trail: one translucent mesh holding a ring of plane copies,
+        # so the scene keeps a single GL item instead of one per frame
+        self.trail_len = 40
+        nv = len(self._verts)
+        self._trail_verts = np.zeros((self.trail_len*nv, 3), dtype=np.float32)
+        self._trail_faces = (self._faces[None, :, :] + nv*np.arange(self.trail_len, dtype=np.uint32)[:, None, None]).reshape(-1, 3)
+        # fade-by-age colors, laid out twice so every cursor position is a plain slice
+        fade = 0.35*(1 - np.arange(self.trail_len)/self.trail_len)
+        self._trail_color_lut = np.zeros((2*self.trail_len*nv, 4), dtype=np.float32)
+        self._trail_color_lut[:, :3] = (0.2, 0.6, 1.0)
+        self._trail_color_lut[:, 3] = np.repeat(np.tile(fade[::-1], 2), nv)
+        self._trail_cursor = 0
+        # one MeshData for the life of the trail; frames write into its arrays and
+        # call meshDataChanged() rather than building a new MeshData via setMeshData()
+        self._trail_md = gl.MeshData(vertexes=self._trail_verts, faces=self._trail_faces,
+                                     vertexColors=self._trail_colors(0))
+        # MeshData may have copied the vertices; make sure it holds our ring buffer
+        self._trail_md._vertexes = self._trail_verts
+        self.trail_item = gl.GLMeshItem(meshdata=self._trail_md, smooth=True, computeNormals=False)
+        self.trail_item.setGLOptions('translucent')
+        self.view.addItem(self.trail_item)
 
         # Data
-        self.latest = [0.0,0.0,0.0]
-        self.smoothed = [0.0,0.0,0.0]
+        self.latest = np.zeros(3)
+        self.smoothed = np.zeros(3)
         self.alpha = 0.25
-        self.offsets = [0.0,0.0,0.0]
+        self.offsets = np.zeros(3)
         # quaternion for smooth rotation (w, x, y, z)
         self.current_quat = np.array([1.0, 0.0, 0.0, 0.0])
+        self._quat_scratch = np.empty(4)
+        # last orientation pushed to GL, used to skip redraws while idle
+        self._last_drawn = np.full(3, np.inf)
 
         # Serial
         self.serial_thread = None
@@ -161,59 +293,30 @@ class PyQtVisualizer(QtWidgets.QWidget):
         self.disconnect_btn.clicked.connect(self.ui_disconnect)
         self.launch_ursina_btn.clicked.connect(self.launch_ursina)
 
+        # port scans run on the global thread pool and report back here
+        self._port_scan_signals = _PortScanSignals(self)
+        self._port_scan_signals.done.connect(self._ports_scanned)
+        self._port_scan_busy = False
+        self._ports_cache = []
+        self._ports_cache_ts = -math.inf
+
         # initial port list
         self.refresh_ports()
 
-        # Timer
+        # Timer (precise, so the 16 ms period doesn't drift against vsync on coarse-timer platforms)
         self.timer = QtCore.QTimer()
+        self.timer.setTimerType(QtCore.Qt.PreciseTimer)
         self.timer.timeout.connect(self.update_visual)
         self.timer.start(16)
 
+        # Readouts refresh on their own, slower timer (20 Hz)
+        self.readout_timer = QtCore.QTimer()
+        self.readout_timer.timeout.connect(self.update_readout)
+        self.readout_timer.start(50)
+
         # Mock generator timer
         self.mock_timer = 0.0
 
-    # --- Quaternion helpers for smooth rotation ---
-    def _quat_from_euler(self, roll, pitch, yaw):
-        # roll (x), pitch (y), yaw (z) in radians
-        cr = math.cos(roll/2)
-        sr = math.sin(roll/2)
-        cp = math.cos(pitch/2)
-        sp = math.sin(pitch/2)
-        cy = math.cos(yaw/2)
-        sy = math.sin(yaw/2)
-        # ZYX order
-        w = cy*cp*cr + sy*sp*sr
-        x = cy*cp*sr - sy*sp*cr
-        y = cy*sp*cr + sy*cp*sr
-        z = sy*cp*cr - cy*sp*sr
-        return np.array([w, x, y, z])
-
-    def _quat_slerp(self, q0, q1, t):
-        # Spherical linear interpolation
-        dot = np.dot(q0, q1)
-        if dot < 0.0:
-            q1 = -q1
-            dot = -dot
-        DOT_THRESHOLD = 0.9995
-        if dot > DOT_THRESHOLD:
-            # linear fallback
-            result = q0 + t*(q1 - q0)
-            return result/np.linalg.norm(result)
-        theta_0 = math.acos(dot)
-        theta = theta_0 * t
-        q2 = q1 - q0*dot
-        q2 = q2 / np.linalg.norm(q2)
-        return q0*math.cos(theta) + q2*math.sin(theta)
-
-    def _quat_to_matrix(self, q):
-        # convert quaternion to 3x3 rotation matrix
-        w,x,y,z = q
-        return np.array([
-            [1-2*(y*y+z*z), 2*(x*y - z*w), 2*(x*z + y*w)],
-            [2*(x*y + z*w), 1-2*(x*x+z*z), 2*(y*z - x*w)],
-            [2*(x*z - y*w), 2*(y*z + x*w), 1-2*(x*x+y*y)]
-        ])
-
     def _make_plane_mesh(self):
         # Create a simple low-poly airplane-like plane centered at origin
         verts = np.array([
@@ -222,19 +325,25 @@ class PyQtVisualizer(QtWidgets.QWidget):
             [-0.6, 0.0, -0.4],  # left tail
             [ 0.6, 0.0, -0.4],  # right tail
             [ 0.0, 0.2, -0.8],  # vertical tail top
-        ], dtype=float)
+        ], dtype=np.float32)
         faces = np.array([
             [0,1,2], [1,3,2],  # main quad
             [2,3,4]  # tail
-        ], dtype=int)
+        ], dtype=np.uint32)
         return verts, faces
 
+    def _trail_colors(self, newest):
+        # view into the fade table with slot `newest` the most opaque (no per-frame math)
+        nv = len(self._verts)
+        start = (self.trail_len - newest - 1) * nv
+        return self._trail_color_lut[start:start + self.trail_len*nv]
+
     def start_serial(self, port):
         if self.serial_thread:
             self.serial_thread.stop()
         self.serial_thread = SerialThread(port)
-        self.serial_thread.line_received.connect(self.on_line)
-        self.serial_thread.start()
+        # scheduler jitter, not throughput, is what delays samples on a busy desktop
+        self.serial_thread.start(QtCore.QThread.TimeCriticalPriority)
         self.port = port
         self.connect_btn.setEnabled(False)
         self.disconnect_btn.setEnabled(True)
@@ -246,15 +355,6 @@ class PyQtVisualizer(QtWidgets.QWidget):
         self.connect_btn.setEnabled(True)
         self.disconnect_btn.setEnabled(False)
 
-    def on_line(self, line):
-        parts = line.split(',')
-        if len(parts) == 3:
-            try:
-                r = float(parts[0]); p = float(parts[1]); y = float(parts[2])
-                self.latest = [r,p,y]
-            except ValueError:
-                pass
-
     def toggle_mock(self):
         self.mock = not self.mock
         if self.mock:
@@ -262,72 +362,74 @@ class PyQtVisualizer(QtWidgets.QWidget):
         self.mock_btn.setText('Toggle Mock (On)' if self.mock else 'Toggle Mock')
 
     def calibrate(self):
-        self.offsets = self.smoothed.copy()
+        self.offsets[:] = self.smoothed
 
     def update_visual(self):
         # mock data
         if self.mock:
             t = time.time(); self.latest[0] = math.sin(t*0.8)*45; self.latest[1] = math.sin(t*0.6)*35; self.latest[2] = math.sin(t*0.5)*90
+        elif self.serial_thread:
+            # pull the newest serial sample, if any arrived since the last frame
+            sample = self.serial_thread.take_latest()
+            if sample is not None:
+                self.latest[:] = sample
+
+        # smoothing (exponential moving average, in place)
+        np.multiply(self.smoothed, 1-self.alpha, out=self.smoothed)
+        self.smoothed += self.alpha * self.latest
+
+        # skip all GL work while the orientation is (nearly) still
+        if np.abs(self.smoothed - self._last_drawn).max() < self.DRAW_THRESHOLD:
+            return
+        self._last_drawn[:] = self.smoothed
 
-        # smoothing
-        for i in range(3):
-            self.smoothed[i] = self.alpha * self.latest[i] + (1-self.alpha) * self.smoothed[i]
-            val = self.smoothed[i] - self.offsets[i]
-
-        # apply rotation to plane using quaternion slerp for smoothness
-        roll_rad = math.radians(self.smoothed[0])
-        pitch_rad = math.radians(self.smoothed[1])
-        yaw_rad = math.radians(self.smoothed[2])
-        target_q = self._quat_from_euler(roll_rad, pitch_rad, yaw_rad)
+        # slerp towards the smoothed orientation and rotate the trail vertices, in one kernel call
         # slerp factor (use alpha to control responsiveness)
         slerp_t = max(0.02, 1.0 - self.alpha)
-        new_q = self._quat_slerp(self.current_quat, target_q, slerp_t)
-        new_q = new_q / np.linalg.norm(new_q)
+        new_q = update_orientation(self.current_quat, self.smoothed[0], self.smoothed[1], self.smoothed[2],
+                                   slerp_t, self._verts, self._verts_out, self._quat_scratch)
+        # swap buffers so no quaternion is allocated per frame
+        self._quat_scratch = self.current_quat
         self.current_quat = new_q
-        R = self._quat_to_matrix(self.current_quat)
-        verts, faces = self._make_plane_mesh()
-        verts = verts.dot(R.T)
-        # update mesh with rotated vertices
-        self.plane.setMeshData(vertexes=verts, faces=faces)
+        # let the GPU rotate the plane instead of rewriting its vertices
+        w, x, y, z = self.current_quat
+        m = QtGui.QMatrix4x4()
+        m.rotate(QtGui.QQuaternion(float(w), float(x), float(y), float(z)))
+        self.plane.setTransform(m)
 
         # update trail
         if not self.mock:
-            md = gl.MeshData(vertexes=verts.copy(), faces=faces)
-            alpha_val = 0.35
-            item = gl.GLMeshItem(meshdata=md, smooth=True, color=(0.2,0.6,1,alpha_val))
-            item.setGLOptions('translucent')
-            self.view.addItem(item)
-            self.trail.append(item)
-            # fade trail items progressively
-            n = len(self.trail)
-            for idx, it in enumerate(self.trail):
-                frac = (idx+1)/n
-                try:
-                    it.opts['color'] = (0.2, 0.6, 1.0, alpha_val*(1-frac))
-                except Exception:
-                    pass
-            if len(self.trail) > self.trail.maxlen:
-                old = self.trail.popleft()
-                try:
-                    self.view.removeItem(old)
-                except Exception:
-                    pass
-
-        # update readouts
-        self.roll_label.setText(f'Roll: {self.smoothed[0]:.2f}')
-        self.pitch_label.setText(f'Pitch: {self.smoothed[1]:.2f}')
-        self.yaw_label.setText(f'Yaw: {self.smoothed[2]:.2f}')
-        self.roll_meter.setValue(int(self.smoothed[0]))
-        self.pitch_meter.setValue(int(self.smoothed[1]))
-        self.yaw_meter.setValue(int(self.smoothed[2]))
+            # copy the kernel's rotated vertices over the oldest slot of the ring
+            nv = len(self._verts)
+            slot = self._trail_cursor
+            self._trail_verts[slot*nv:(slot+1)*nv] = self._verts_out
+            self._trail_cursor = (slot + 1) % self.trail_len
+            md = self._trail_md
+            md._vertexColors = self._trail_colors(slot)
+            md._vertexesIndexedByFaces = None
+            md._vertexColorsIndexedByFaces = None
+            self.trail_item.meshDataChanged()
+
+    def update_readout(self):
+        self.readout.set_values(*self.smoothed)
 
     def refresh_ports(self):
-        # List available serial ports
-        try:
-            from serial.tools import list_ports
-            ports = [p.device for p in list_ports.comports()]
-        except Exception:
-            ports = []
+        # List available serial ports without blocking the GUI thread
+        if time.monotonic() - self._ports_cache_ts < self.PORT_CACHE_SECS:
+            self._fill_ports(self._ports_cache)
+            return
+        if self._port_scan_busy:
+            return
+        self._port_scan_busy = True
+        QtCore.QThreadPool.globalInstance().start(_PortScan(self._port_scan_signals))
+
+    def _ports_scanned(self, ports):
+        self._port_scan_busy = False
+        self._ports_cache = ports
+        self._ports_cache_ts = time.monotonic()
+        self._fill_ports(ports)
+
+    def _fill_ports(self, ports):
         self.port_box.clear()
         self.port_box.addItems(ports)
 
@@ -364,6 +466,11 @@ def main():
     parser.add_argument('--mock',action='store_true')
     args = parser.parse_args()
 
+    # Sync buffer swaps to the display; must be set before any GL widget is created
+    fmt = QtGui.QSurfaceFormat.defaultFormat()
+    fmt.setSwapInterval(1)
+    QtGui.QSurfaceFormat.setDefaultFormat(fmt)
+
     app = QtWidgets.QApplication(sys.argv)
     # Set a safe default system font to avoid missing-font warnings
     try:
@@ -2,16 +2,24 @@
 
 from ursina import *
 import serial
-import threading
 import sys
 import argparse
 import time
 import math
+import os
+import struct
+
+import numpy as np
+from panda3d.core import NodePath, Quat, RigidBodyCombiner
+
+from orientation_kernel import smooth_step
+from serial_parse import newest_sample
 
 # --- Arguments ---
 parser = argparse.ArgumentParser(description='MPU6050 Ursina visualizer')
 parser.add_argument('--port', '-p', help='Serial port to use (e.g. COM3)')
 parser.add_argument('--mock', action='store_true', help='Use mock data instead of serial (for testing)')
+parser.add_argument('--binary', action='store_true', help='Expect binary frames from the sketch (BINARY_FRAMES 1); detected automatically otherwise')
 args = parser.parse_args()
 
 # --- Ursina App Setup ---
@@ -19,20 +27,25 @@ app = Ursina()
 
 
 # --- Airplane-like board shape ---
-board = Entity(model=None, color=color.azure, texture=None)
+# The parts are built as child cubes and then merged into the board's own mesh with combine(),
+# so the board is one node and one draw call; child colors are baked in as vertex colors.
+board = Entity(model=None, texture=None)
 # Main body (fuselage)
-body = Entity(model='cube', parent=board, scale=(2.2, 0.18, 0.5), color=color.azure, position=(0, 0, 0))
+Entity(model='cube', parent=board, scale=(2.2, 0.18, 0.5), color=color.azure, position=(0, 0, 0))
 # Wings
-left_wing = Entity(model='cube', parent=board, scale=(0.7, 0.05, 1.6), color=color.rgba(80, 180, 255, 220), position=(-0.7, 0, 0))
-right_wing = Entity(model='cube', parent=board, scale=(0.7, 0.05, 1.6), color=color.rgba(80, 180, 255, 220), position=(0.7, 0, 0))
+Entity(model='cube', parent=board, scale=(0.7, 0.05, 1.6), color=color.rgba(80, 180, 255, 220), position=(-0.7, 0, 0))
+Entity(model='cube', parent=board, scale=(0.7, 0.05, 1.6), color=color.rgba(80, 180, 255, 220), position=(0.7, 0, 0))
 # Tail (vertical stabilizer)
-tail = Entity(model='cube', parent=board, scale=(0.25, 0.18, 0.4), color=color.rgba(255, 220, 80, 220), position=(0, 0.13, -0.7))
+Entity(model='cube', parent=board, scale=(0.25, 0.18, 0.4), color=color.rgba(255, 220, 80, 220), position=(0, 0.13, -0.7))
 # Nose pointer
-pointer = Entity(model='cube', parent=board, scale=(0.14, 0.25, 0.7), position=(0, 0, 0.85), color=color.red)
-# Axis markers
-x_axis = Entity(parent=board, model='cube', scale=(1.0, 0.03, 0.03), position=(0.5, 0.21, 0), color=color.red)
-y_axis = Entity(parent=board, model='cube', scale=(0.03, 1.0, 0.03), position=(0.0, -0.5, 0), color=color.green)
-z_axis = Entity(parent=board, model='cube', scale=(0.03, 0.03, 1.0), position=(0, 0.21, 0.5), color=color.blue)
+Entity(model='cube', parent=board, scale=(0.14, 0.25, 0.7), position=(0, 0, 0.85), color=color.red)
+board.combine()
+# Axis markers: merged into one child of their own so they can still be toggled with 'a'
+axes = Entity(parent=board)
+Entity(parent=axes, model='cube', scale=(1.0, 0.03, 0.03), position=(0.5, 0.21, 0), color=color.red)
+Entity(parent=axes, model='cube', scale=(0.03, 1.0, 0.03), position=(0.0, -0.5, 0), color=color.green)
+Entity(parent=axes, model='cube', scale=(0.03, 0.03, 1.0), position=(0, 0.21, 0.5), color=color.blue)
+axes.combine()
 
 # Camera and environment tweaks
 
@@ -51,25 +64,69 @@ show_axes = True
 # Trail (ghost boards) to show recent orientations
 max_trail_capacity = 30
 trail_length = 12  # current visible length (can be changed at runtime)
-trail = []  # list of ghost Entities (max capacity)
+trail = []  # list of ghost Entities (max capacity); trail[i] always shows the rotation i ticks old
+
+# The visible ghosts live under a RigidBodyCombiner, which draws them as one batch while their
+# transforms still animate. Anything other than a transform (which ghosts are attached, their
+# colors) only takes effect on collect(), so that is redone only when the trail length changes.
+trail_root = NodePath(RigidBodyCombiner('trail'))
+trail_root.reparentTo(scene)
+trail_spare = NodePath('trail_spare')  # detached holder for ghosts beyond trail_length
 
 def create_ghost():
-    g = Entity(model='cube', scale=board.scale, color=color.rgba(150, 170, 255, 40), visible=False)
-    # pointer child
-    p = Entity(model='cube', parent=g, scale=(0.14, 0.25, 0.7), position=(0, 0, 0.85), color=color.rgba(255, 80, 80, 180))
-    # axes children
+    # one merged mesh per ghost; its .color then only scales the baked vertex colors (the fade)
+    g = Entity(parent=trail_spare, scale=board.scale)
+    Entity(model='cube', parent=g, color=color.rgba(120, 170, 255, 255))
+    # pointer
+    Entity(model='cube', parent=g, scale=(0.14, 0.25, 0.7), position=(0, 0, 0.85), color=color.rgba(255, 80, 80, 180))
+    # axes
     Entity(parent=g, model='cube', scale=(1.0, 0.03, 0.03), position=(0.5, 0.21, 0), color=color.rgba(255, 50, 50, 200))
     Entity(parent=g, model='cube', scale=(0.03, 1.0, 0.03), position=(0.0, -0.5, 0), color=color.rgba(50, 255, 50, 200))
     Entity(parent=g, model='cube', scale=(0.03, 0.03, 1.0), position=(0, 0.21, 0.5), color=color.rgba(50, 100, 255, 200))
+    g.combine()
     return g
 
 for i in range(max_trail_capacity):
     trail.append(create_ghost())
 
+# recent board orientations as a ring of Panda3D quaternions: trail_rot[trail_head] is the newest.
+# Copying quaternions node to node skips Ursina's Euler conversion on every get and set.
+trail_rot = [Quat() for _ in range(max_trail_capacity)]
+trail_head = 0
+
+
+_trail_color_tables = {}  # trail length -> fade Color per ghost, built once per length
+
+
+def trail_colors(length):
+    table = _trail_color_tables.get(length)
+    if table is None:
+        n = max(1, length)
+        table = _trail_color_tables[length] = [color.rgba(255, 255, 255, int(180 * (1 - i / n)))
+                                               for i in range(max_trail_capacity)]
+    return table
+
+
+def layout_trail():
+    """Attach and fade the first trail_length ghosts, then rebuild the combined batch."""
+    colors = trail_colors(trail_length)
+    for i, g in enumerate(trail):
+        if i < trail_length:
+            g.color = colors[i]
+            g.reparent_to(trail_root)
+        else:
+            g.reparent_to(trail_spare)
+    trail_root.node().collect()
+
+
+layout_trail()
+
 # Simple bar meters for roll/pitch/yaw
 meter_roll = Entity(parent=camera.ui, model='quad', scale=(0.25, 0.02), position=Vec2(-0.6, 0.45), color=color.red)
 meter_pitch = Entity(parent=camera.ui, model='quad', scale=(0.25, 0.02), position=Vec2(-0.6, 0.40), color=color.green)
 meter_yaw = Entity(parent=camera.ui, model='quad', scale=(0.25, 0.02), position=Vec2(-0.6, 0.35), color=color.blue)
+_meters = (meter_roll, meter_pitch, meter_yaw)
+_meter_widths = [0.25, 0.25, 0.25]
 meter_bg = Entity(parent=camera.ui, model='quad', scale=(0.26, 0.1), position=Vec2(-0.6, 0.38), color=color.rgba(255,255,255,8))
 
 # smoothing (defined early so labels can reference it)
@@ -80,10 +137,11 @@ alpha_label = Text(text=f'Smooth: {alpha:.2f}', parent=camera.ui, position=Vec2(
 trail_label = Text(text=f'Trail: {trail_length}', parent=camera.ui, position=Vec2(0.48, 0.38), scale=0.7, color=color.white)
 
 # calibration offsets
-offsets = [0.0, 0.0, 0.0]
+offsets = np.zeros(3)
 
 # sample data for playback (simple synthetic waveform)
-sample_data = [(math.sin(i/10)*40, math.sin(i/12)*30, math.sin(i/15)*90) for i in range(0, 720)]
+_i = np.arange(720)
+sample_data = np.stack([np.sin(_i / 10) * 40, np.sin(_i / 12) * 30, np.sin(_i / 15) * 90], axis=1)
 playback_mode = False
 playback_index = 0
 playback_timer = 0.0
@@ -99,18 +157,18 @@ def set_trail(d):
     global trail_length
     trail_length = max(0, min(max_trail_capacity, trail_length + d))
     trail_label.text = f'Trail: {trail_length}'
+    layout_trail()
 
 def calibrate():
     # set current smoothed_angles as zero offsets
-    global offsets
-    offsets = smoothed_angles.copy()
-    status_text.text = 'Calibrated'
+    offsets[:] = smoothed_angles
+    set_status('Calibrated')
 
 def toggle_playback():
     global playback_mode, playback_index
     playback_mode = not playback_mode
     playback_index = 0
-    status_text.text = 'Playback on' if playback_mode else 'Playback off'
+    set_status('Playback on' if playback_mode else 'Playback off')
 
 # Buttons
 btn_alpha_minus = Button(text='- Smooth', parent=camera.ui, position=Vec2(0.40, 0.45), scale=0.06)
@@ -129,57 +187,199 @@ btn_play.on_click = toggle_playback
 
 # --- Serial / Data Handling ---
 # Mutable shared state
-latest_angles = [0.0, 0.0, 0.0]  # Roll, Pitch, Yaw (degrees)
-smoothed_angles = [0.0, 0.0, 0.0]
-alpha = 0.25  # smoothing factor (0..1), higher = less smoothing
+latest_angles = np.zeros(3)  # newest Roll, Pitch, Yaw (degrees) from the serial port
+smoothed_angles = np.zeros(3)
+meter_widths = np.zeros(3)  # written by smooth_step each frame, shown by the slow tick
 serial_running = False
 use_mock = args.mock or False
 serial_port = args.port
 
 
-def clamp(v, lo=-360, hi=360):
-    return max(lo, min(hi, v))
+def publish_angles(r, p, y):
+    """Hand a new (roll, pitch, yaw) sample to the render loop."""
+    # serial is drained on the render loop itself, so the sample is simply written in place
+    latest_angles[:] = (r, p, y)
 
 
-def serial_reader_thread(ser):
-    """Read lines from serial and update latest_angles."""
-    global latest_angles, serial_running
-    serial_running = True
-    while serial_running:
-        try:
-            line = ser.readline().decode('utf-8', errors='ignore').strip()
-            if not line:
-                continue
-            parts = line.split(',')
-            if len(parts) == 3:
-                try:
-                    r = float(parts[0])
-                    p = float(parts[1])
-                    y = float(parts[2])
-                    latest_angles[0] = clamp(r)
-                    latest_angles[1] = clamp(p)
-                    latest_angles[2] = clamp(y)
-                except ValueError:
-                    # skip malformed
-                    pass
+# Serial input is drained from update() on the main loop rather than a reader thread, so the
+# render loop never trades the GIL with it. Reads never block: on POSIX the fd is made
+# non-blocking, elsewhere only what in_waiting reports is read.
+USE_FD_READS = os.name == 'posix'
+serial_buf = bytearray()
+# a stream without newlines (wrong baud, binary before it is detected) must not grow the buffer forever
+SERIAL_BUF_MAX = 65536
 
-        except Exception as e:
-            print('Serial reader error:', e)
+
+def prepare_reader(ser):
+    if USE_FD_READS:
+        os.set_blocking(ser.fileno(), False)
+
+
+def read_available(ser):
+    """Return all the bytes already received (b'' if none), without waiting."""
+    if USE_FD_READS:
+        # read until the kernel buffer is empty, so a backlog from slow frames is cleared in one go
+        # and the newest line parsed afterwards really is the newest
+        fd = ser.fileno()
+        chunks = []
+        while True:
             try:
-                ser.close()
-            except Exception:
-                pass
-            serial_running = False
-            break
+                data = os.read(fd, 4096)
+            except BlockingIOError:
+                break
+            if not data:
+                # readable but empty: the device went away
+                raise serial.SerialException('device reports readiness to read but returned no data')
+            chunks.append(data)
+        return b''.join(chunks)
+    n = ser.in_waiting
+    return ser.read(n) if n else b''
+
+
+def drain_lines(buf):
+    """Publish the newest valid line in buf and drop every complete line."""
+    idx = buf.rfind(b'\n')
+    if idx < 0:
+        return
+    # clamping to +-360 happens once per frame in smooth_step
+    sample = newest_sample(buf, idx)
+    if sample is not None:
+        publish_angles(*sample)
+    del buf[:idx + 1]
+
+
+# Binary frame: 0xA5, roll/pitch/yaw as little-endian int16 deci-degrees, XOR of the 6 payload bytes
+FRAME_SYNC = 0xA5
+FRAME_LEN = 8
+_frame = struct.Struct('<hhh')
+FRAME_CHECK_BLOCK = 64  # frames checked per vectorised pass
+
+
+def valid_frame_run(buf, i, max_frames=None):
+    """Return how many consecutive valid frames start at buf[i], up to max_frames."""
+    n = (len(buf) - i) // FRAME_LEN
+    if max_frames is not None:
+        n = min(n, max_frames)
+    # most resync candidates are stray 0xA5 bytes, so check the first frame in plain Python
+    # before building any array
+    f = buf[i:i + FRAME_LEN]
+    if not n or f[0] != FRAME_SYNC or f[1] ^ f[2] ^ f[3] ^ f[4] ^ f[5] ^ f[6] != f[7]:
+        return 0
+    run = 1
+    while run < n:
+        # vectorised over at most FRAME_CHECK_BLOCK frames, so a short run never costs the whole buffer;
+        # the view is released on return, before the caller resizes buf
+        k = min(n - run, FRAME_CHECK_BLOCK)
+        frames = np.frombuffer(buf, np.uint8, k * FRAME_LEN, i + run * FRAME_LEN).reshape(k, FRAME_LEN)
+        good = (frames[:, 0] == FRAME_SYNC) & (np.bitwise_xor.reduce(frames[:, 1:-1], axis=1) == frames[:, -1])
+        if not good.all():
+            return run + int(good.argmin())
+        run += k
+    return run
+
+
+def drain_frames(buf):
+    """Publish the newest valid binary frame in buf, keep only a trailing partial frame, return the count."""
+    found = 0
+    i = buf.find(FRAME_SYNC)
+    while 0 <= i <= len(buf) - FRAME_LEN:
+        run = valid_frame_run(buf, i)
+        if run:
+            # only the newest frame of an aligned run is decoded
+            r_d, p_d, y_d = _frame.unpack_from(buf, i + (run - 1) * FRAME_LEN + 1)
+            publish_angles(r_d * 0.1, p_d * 0.1, y_d * 0.1)
+            found += run
+            i += run * FRAME_LEN
+        else:
+            # not a real frame start (or a corrupted frame); resync on the next sync byte
+            i += 1
+        i = buf.find(FRAME_SYNC, i)
+    del buf[:len(buf) if i < 0 else i]
+    return found
+
+
+# Autodetection: a single checksum match after a stray 0xA5 happens by chance, a run of them does not.
+# If detected binary decodes nothing while parseable text lines keep arriving, go back to text;
+# a bare 0x0A proves nothing, it is an ordinary byte inside frames.
+DETECT_FRAME_RUN = 3
+TEXT_FALLBACK_READS = 3
+binary_mode = args.binary
+text_streak = 0  # reads in binary mode that decoded no frame but did carry a valid text line
+
+
+def has_frame_run(buf, start):
+    """Return whether DETECT_FRAME_RUN valid frames in a row start at or after buf[start], without consuming."""
+    # stops at the first such run and checks only that many frames per candidate sync byte
+    i = buf.find(FRAME_SYNC, max(start, 0))
+    while 0 <= i <= len(buf) - DETECT_FRAME_RUN * FRAME_LEN:
+        if valid_frame_run(buf, i, DETECT_FRAME_RUN) == DETECT_FRAME_RUN:
+            return True
+        i = buf.find(FRAME_SYNC, i + 1)
+    return False
+
+
+def drain_serial():
+    """Read everything the port has buffered and publish the newest angles."""
+    global serial_running, binary_mode, text_streak
+    try:
+        data = read_available(ser)
+        if not data:
+            return
+        serial_buf.extend(data)
+        # a run not seen on earlier reads must reach into the new bytes, so only the tail is scanned
+        if not binary_mode and has_frame_run(
+                serial_buf, len(serial_buf) - len(data) - DETECT_FRAME_RUN * FRAME_LEN + 1):
+            # the text protocol is pure ASCII, so a run of checksummed frames means the sketch sends binary
+            binary_mode = True
+            text_streak = 0
+        if binary_mode:
+            if drain_frames(serial_buf):
+                text_streak = 0
+            elif not args.binary and newest_sample(data, data.rfind(b'\n')) is not None:
+                text_streak += 1
+                if text_streak >= TEXT_FALLBACK_READS:
+                    binary_mode = False
+                    text_streak = 0
+        else:
+            drain_lines(serial_buf)
+        if len(serial_buf) > SERIAL_BUF_MAX:
+            del serial_buf[:-SERIAL_BUF_MAX]
+    except Exception as e:
+        print('Serial reader error:', e)
+        try:
+            ser.close()
+        except Exception:
+            pass
+        serial_running = False
+        set_status('Status: serial error')
+
+
+# USB-serial bridges found on ESP32 boards; Espressif's own VID covers any PID (native USB)
+ESP32_VIDPIDS = {(0x10C4, 0xEA60), (0x1A86, 0x7523)}  # CP210x, CH340
+ESPRESSIF_VID = 0x303A
+
+
+def esp32_ports():
+    """Return the device names of present ports that look like an ESP32, without opening any."""
+    try:
+        from serial.tools import list_ports
+        return [p.device for p in list_ports.comports()
+                if p.vid == ESPRESSIF_VID or (p.vid, p.pid) in ESP32_VIDPIDS]
+    except Exception:
+        return []
 
 
 def find_serial_port(explicit_port=None):
-    """Try the explicit port first, then common ports for the platform."""
+    """Try the explicit port first, then detected ESP32 ports, then common ports for the platform."""
     ports_to_try = []
     if explicit_port:
         ports_to_try.append(explicit_port)
+    detected = [p for p in esp32_ports() if p != explicit_port]
 
-    if sys.platform.startswith('win'):
+    # brute-force guesses only when nothing was detected
+    if detected:
+        ports_to_try += detected
+    elif sys.platform.startswith('win'):
         ports_to_try += [f'COM{i}' for i in range(1, 20)]
     elif sys.platform.startswith('linux'):
         ports_to_try += [f'/dev/ttyUSB{i}' for i in range(10)] + [f'/dev/ttyACM{i}' for i in range(10)]
@@ -190,13 +390,35 @@ def find_serial_port(explicit_port=None):
         try:
             ser = serial.Serial(port, 115200, timeout=0.1)
             print(f'Connected to {port}')
-            return ser
         except Exception:
             continue
+        set_low_latency(ser)
+        return ser
 
     return None
 
 
+def set_low_latency(ser):
+    """Ask the Linux serial driver not to hold received bytes back (ASYNC_LOW_LATENCY)."""
+    # FTDI/CDC drivers otherwise batch input for up to 16 ms before waking the reader
+    if not sys.platform.startswith('linux'):
+        return
+    try:
+        # pyserial's TIOCGSERIAL/TIOCSSERIAL wrapper; needs a driver that supports it
+        ser.set_low_latency_mode(True)
+    except Exception as e:
+        print('Low-latency mode not available:', e)
+    # FTDI adapters also have their own latency timer (16 ms by default), exposed in sysfs under
+    # the tty name, so resolve /dev/serial/by-id/... symlinks first
+    latency_timer = f'/sys/bus/usb-serial/devices/{os.path.basename(os.path.realpath(ser.port))}/latency_timer'
+    if os.path.exists(latency_timer):
+        try:
+            with open(latency_timer, 'w') as f:
+                f.write('1')
+        except OSError as e:
+            print('Could not lower the USB latency timer:', e)
+
+
 # --- UI elements ---
 roll_text = Text(text='Roll: 0.00', origin=(0, 8), position=Vec2(-0.88, 0.42), scale=1.2, color=color.white)
 pitch_text = Text(text='Pitch: 0.00', origin=(0, 8), position=Vec2(-0.88, 0.36), scale=1.0, color=color.white)
@@ -205,120 +427,192 @@ status_text = Text(text='Status: starting...', origin=(0, 8), position=Vec2(-0.8
 instructions = Text(text="Space: pause/resume | M: toggle mock data | Esc: quit", origin=(0, 8), position=Vec2(-0.88, -0.45), scale=0.6, color=color.azure)
 
 
+def set_status(text):
+    # rebuilding a Text re-tessellates its glyphs; skip writes that would not change it
+    if status_text.text != text:
+        status_text.text = text
+
+
+_readouts = ((roll_text, 'Roll'), (pitch_text, 'Pitch'), (yaw_text, 'Yaw'))
+_last_shown = [None, None, None]  # last rounded value written to each Text
+
+
 def update_ui():
-    roll_text.text = f'Roll: {smoothed_angles[0]:.2f}°'
-    pitch_text.text = f'Pitch: {smoothed_angles[1]:.2f}°'
-    yaw_text.text = f'Yaw: {smoothed_angles[2]:.2f}°'
+    # rebuilding a Text re-tessellates its glyphs, so only touch the ones whose shown value changed
+    for i, v in enumerate(np.round(smoothed_angles, 2)):
+        if v != _last_shown[i]:
+            _last_shown[i] = v
+            t, name = _readouts[i]
+            t.text = f'{name}: {v:.2f}°'
 
 
 # --- Mock data generator (for testing without device) ---
-def mock_update(dt):
-    t = time.time()
-    # slow, smooth rotations
-    latest_angles[0] = math.sin(t * 0.8) * 40  # roll
-    latest_angles[1] = math.sin(t * 0.6) * 30  # pitch
-    latest_angles[2] = math.sin(t * 0.5) * 90  # yaw
+# slow, smooth rotations, tabulated once; 0.8, 0.6 and 0.5 rad/s all repeat every 2*pi/0.1 s
+MOCK_PERIOD = 2 * math.pi / 0.1
+MOCK_N = 4096
+_t = np.arange(MOCK_N) * (MOCK_PERIOD / MOCK_N)
+mock_table = np.stack([np.sin(_t * 0.8) * 40,   # roll
+                       np.sin(_t * 0.6) * 30,   # pitch
+                       np.sin(_t * 0.5) * 90],  # yaw
+                      axis=1)
+
+
+def mock_sample():
+    """Return the current row of mock_table; it feeds smooth_step directly, without publishing."""
+    return mock_table[int(time.time() * (MOCK_N / MOCK_PERIOD)) % MOCK_N]
 
 
 # keyboard / input handling
 paused = False
 
 
+def toggle_pause():
+    global paused
+    paused = not paused
+    set_status('Status: paused' if paused else 'Status: running')
+
+
+def toggle_mock():
+    global use_mock
+    use_mock = not use_mock
+    set_status('Status: mock' if use_mock else 'Status: serial')
+
+
+def toggle_trail():
+    global show_trail
+    show_trail = not show_trail
+    set_status('Trail: on' if show_trail else 'Trail: off')
+
+
+def toggle_axes():
+    global show_axes
+    show_axes = not show_axes
+    axes.visible = show_axes
+    set_status('Axes: on' if show_axes else 'Axes: off')
+
+
+KEY_HANDLERS = {
+    'space': toggle_pause,
+    'm': toggle_mock,
+    't': toggle_trail,
+    'a': toggle_axes,
+    'c': calibrate,
+    'p': toggle_playback,
+    '+': lambda: set_alpha(0.05),
+    '-': lambda: set_alpha(-0.05),
+    'escape': application.quit,
+}
+
+
 def input(key):
-    global paused, use_mock, serial_running
-    if key == 'space':
-        paused = not paused
-        status_text.text = 'Status: paused' if paused else 'Status: running'
-    if key == 'm':
-        use_mock = not use_mock
-        status_text.text = 'Status: mock' if use_mock else 'Status: serial'
-    if key == 't':
-        global show_trail
-        show_trail = not show_trail
-        status_text.text = 'Trail: on' if show_trail else 'Trail: off'
-    if key == 'a':
-        global show_axes
-        show_axes = not show_axes
-        x_axis.visible = show_axes
-        y_axis.visible = show_axes
-        z_axis.visible = show_axes
-        status_text.text = 'Axes: on' if show_axes else 'Axes: off'
-    if key == 'c':
-        calibrate()
-    if key == 'p':
-        toggle_playback()
-    if key == '+':
-        set_alpha(0.05)
-    if key == '-':
-        set_alpha(-0.05)
-    if key == 'escape':
-        application.quit()
+    handler = KEY_HANDLERS.get(key)
+    if handler:
+        handler()
 
 
-def update():
-    global smoothed_angles
-    dt = time.dt
-    # If using mock mode, drive angles from function
-    if use_mock:
-        mock_update(dt)
+# Trail, meters and readouts run on a slower fixed-rate tick than the board transform
+LOGIC_HZ = 20
+logic_accum = 0.0
 
-    if paused:
-        return
+# Once the input has been still for IDLE_AFTER seconds, update() stops touching the scene and
+# only refreshes the slow path once per second; any move larger than IDLE_EPS degrees wakes it.
+IDLE_EPS = 0.05
+IDLE_AFTER = 0.2
+IDLE_LOGIC_INTERVAL = 1.0
+prev_latest = np.zeros(3)
+latest_clamped = np.zeros(3)  # the input as smooth_step sees it; the sketch's yaw is never wrapped
+idle_time = 0.0
+# smaller moves than this (degrees) leave the board transform untouched while it settles
+DRAW_THRESHOLD = 0.05
+last_drawn = np.full(3, np.inf)
 
-    # smoothing (exponential moving average)
-    for i in range(3):
-        smoothed_angles[i] = alpha * latest_angles[i] + (1 - alpha) * smoothed_angles[i]
 
-    # Apply rotations: mapping from incoming data to Ursina axes
-    board.rotation_y = smoothed_angles[0]   # Roll -> yaw in Ursina
-    board.rotation_x = smoothed_angles[1]   # Pitch -> x
-    board.rotation_z = -smoothed_angles[2]  # Yaw -> negate for visual alignment
+# the readouts are refreshed at half the slow-tick rate; faster than this cannot be read anyway
+TEXT_HZ = 10
+_last_text_t = 0.0
 
-    update_ui()
 
-    # update trail ghosts
+def run_slow_update():
+    global trail_head, _last_text_t
+    now = time.monotonic()
+    if now - _last_text_t >= 1 / TEXT_HZ:
+        _last_text_t = now
+        update_ui()
+
+    # update trail ghosts (transform writes only, so the combiner needs no collect())
     if show_trail:
-        # shift previous
-        for i in range(trail_length - 1, 0, -1):
-            trail[i].rotation = trail[i - 1].rotation
-            trail[i].visible = True
-            # fade alpha with index
-            alpha_val = int(180 * (1 - i / trail_length))
-            trail[i].color = color.rgba(120, 170, 255, alpha_val)
-        # front ghost = current board
-        trail[0].rotation = board.rotation
-        trail[0].position = board.position
-        trail[0].visible = True
+        trail_root.show()
+        trail_head = (trail_head + 1) % max_trail_capacity
+        trail_rot[trail_head] = board.getQuat()
+        for i in range(trail_length):
+            trail[i].setQuat(trail_rot[(trail_head - i) % max_trail_capacity])
     else:
-        for g in trail:
-            g.visible = False
+        trail_root.hide()
+
+    # update meters (widths come from smooth_step), only when visibly changed
+    for i, m in enumerate(_meters):
+        w = meter_widths[i]
+        if abs(w - _meter_widths[i]) >= 0.001:
+            _meter_widths[i] = w
+            m.scale_x = w
+
+
+def update():
+    global logic_accum, idle_time
+    dt = time.dt
+    if serial_running:
+        drain_serial()
+
+    if paused:
+        return
+
+    # If using mock mode, drive angles from the precomputed waveform
+    latest = np.clip(mock_sample() if use_mock else latest_angles, -360.0, 360.0,
+                     out=latest_clamped)
+    if np.abs(latest - prev_latest).max() > IDLE_EPS or np.abs(latest - smoothed_angles).max() > IDLE_EPS:
+        prev_latest[:] = latest
+        idle_time = 0.0
+    else:
+        idle_time += dt
+    if idle_time > IDLE_AFTER:
+        logic_accum += dt
+        if logic_accum >= IDLE_LOGIC_INTERVAL:
+            logic_accum = 0.0
+            run_slow_update()
+        return
+
+    # clamp + smoothing (exponential moving average, in place) + meter widths, in one kernel call
+    smooth_step(latest, smoothed_angles, alpha, meter_widths)
 
-    # update meters (map angle to 0..1)
-    def norm_angle(a):
-        return (a + 180) / 360
+    # Apply rotations in one write: mapping from incoming data to Ursina axes
+    if np.abs(smoothed_angles - last_drawn).max() >= DRAW_THRESHOLD:
+        last_drawn[:] = smoothed_angles
+        board.rotation = (smoothed_angles[1],    # Pitch -> x
+                          smoothed_angles[0],    # Roll -> yaw in Ursina
+                          -smoothed_angles[2])   # Yaw -> negate for visual alignment
 
-    meter_roll.scale_x = 0.25 * norm_angle(smoothed_angles[0])
-    meter_pitch.scale_x = 0.25 * norm_angle(smoothed_angles[1])
-    meter_yaw.scale_x = 0.25 * norm_angle(smoothed_angles[2])
+    logic_accum += dt
+    if logic_accum >= 1 / LOGIC_HZ:
+        logic_accum = 0.0
+        run_slow_update()
 
 
-# --- Start serial thread (if not mock) ---
+# --- Open serial (if not mock); update() drains it every frame ---
 ser = None
-thread = None
 if not use_mock:
     ser = find_serial_port(serial_port)
     if ser:
         try:
-            thread = threading.Thread(target=serial_reader_thread, args=(ser,), daemon=True)
-            thread.start()
-            status_text.text = f'Status: connected ({ser.port})'
+            prepare_reader(ser)
+            serial_running = True
+            set_status(f'Status: connected ({ser.port})')
         except Exception as e:
-            print('Could not start serial thread:', e)
-            status_text.text = 'Status: serial error'
+            print('Could not start serial reader:', e)
+            set_status('Status: serial error')
     else:
-        status_text.text = 'Status: no serial found (press M for mock)'
+        set_status('Status: no serial found (press M for mock)')
 else:
-    status_text.text = 'Status: mock mode'
+    set_status('Status: mock mode')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,38 @@
+"""
+Parsing of the sketch's text output, shared by both visualizers.
+
+Lines are matched in place on the receive buffer (bytes, bytearray or a fixed
+bytearray with a write head), so nothing is sliced out or decoded.
+"""
+
+import re
+
+# "roll,pitch,yaw" as printed by the sketch, matched straight on the raw bytes; used with
+# fullmatch so extra fields or two lines run together by a lost newline are rejected,
+# while the trailing \s* still takes the \r of the sketch's \r\n
+LINE_RE = re.compile(rb'\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*')
+
+
+def parse_line(buf, start, stop):
+    """Return (roll, pitch, yaw) from the b'r,p,y' line at buf[start:stop], or None if it is malformed."""
+    m = LINE_RE.fullmatch(buf, start, stop)
+    if m:
+        return float(m[1]), float(m[2]), float(m[3])
+    return None
+
+
+def newest_sample(buf, idx):
+    """
+    Return the sample of the newest valid line in buf[:idx], where buf[idx] is a newline,
+    or None if none of the complete lines parse.
+    Only the newest line matters, so older ones are skipped unparsed; the walk goes back
+    line by line only past malformed ones.
+    """
+    stop = idx
+    while stop >= 0:
+        start = buf.rfind(b'\n', 0, stop) + 1
+        sample = parse_line(buf, start, stop)
+        if sample is not None:
+            return sample
+        stop = start - 1
+    return None